@@ -0,0 +1,452 @@
+"""
+Shared core for the Dante AI Autopatch scripts.
+
+Both the command-line script (autopatch_simple.py) and the GUI
+(autopatch_gui.py) used to carry their own copies of Device,
+PatchSuggestion, DeviceScanner and AutoPatchEngine. A single definition
+keeps the two entry points in sync, probes the Dante Application Library
+(DAL) import exactly once per process, and lets CPython reuse its
+per-type caches when one process imports both modules.
+"""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import functools
+import itertools
+import logging
+import operator
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("autopatch")
+
+try:
+    import psutil  # type: ignore
+except Exception:
+    psutil = None  # type: ignore
+
+# The DAL probe result is cached process-wide under a sys.modules sentinel so
+# that re-executions of this module (sub-process spawns under PyInstaller,
+# test runs that reset module state) skip the import finder chain instead of
+# re-raising ImportError every time.
+_DAL_SENTINEL = "_autopatch_dal_probed"
+if _DAL_SENTINEL in sys.modules:
+    _dal = sys.modules[_DAL_SENTINEL]
+else:
+    try:
+        # Replace this import with the actual DAL import when available
+        import dante_application_library as _dal  # type: ignore
+    except ImportError:
+        _dal = None  # type: ignore
+    sys.modules[_DAL_SENTINEL] = _dal  # type: ignore[assignment]
+
+_DAL_SCANNER_CLS = getattr(_dal, "DeviceScanner", None)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_dal_scanner() -> Optional[Any]:
+    """Return a shared DAL scanner instance, or None when DAL is unavailable.
+
+    The import above is probed exactly once at module load; this getter keeps a
+    single scanner instance alive so repeated discovery calls reuse it.
+    """
+    return _DAL_SCANNER_CLS() if _DAL_SCANNER_CLS is not None else None
+
+
+def _net_interfaces() -> List[Optional[str]]:
+    """Names of the local network interfaces, or a single wildcard entry.
+
+    psutil is optional; without it (or on hosts reporting no interfaces) a
+    single None entry makes discovery fall back to one unscoped query.
+    """
+    if psutil is not None:
+        names = list(psutil.net_if_addrs())
+        if names:
+            return names
+    return [None]
+
+
+def _discovery_round(
+    dal_scanner: Any, ifaces: List[Optional[str]], timeout_ms: int
+) -> List[Any]:
+    """One parallel discovery pass across all interfaces.
+
+    Queries every interface in a bounded thread pool so the round takes the
+    time of the slowest interface (capped at timeout_ms), not their sum.
+    Returns the raw DAL records from queries that finished in time.
+    """
+
+    def query(iface: Optional[str]) -> List[Any]:
+        # hypothetical API; unscoped when no interface is known
+        if iface is None:
+            return dal_scanner.discover_devices()
+        return dal_scanner.discover_devices(iface=iface)
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(ifaces)))
+    try:
+        futures = [pool.submit(query, iface) for iface in ifaces]
+        done, _ = concurrent.futures.wait(futures, timeout=timeout_ms / 1000)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    records: List[Any] = []
+    for fut in done:
+        if fut.exception() is None:
+            records.extend(fut.result())
+    return records
+
+
+@dataclass(repr=False, slots=True)
+class Device:
+    """Represents a generic Dante device on the network."""
+    name: str
+    role: str  # e.g. "console", "stagebox", "amplifier", "monitor"
+    channels_in: int
+    channels_out: int
+    # None until a caller actually attaches metadata, so the common case
+    # skips the per-instance dict allocation entirely.
+    metadata: Optional[Dict[str, Any]] = None
+    _repr: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Built once; devices are display-immutable so the repr never changes
+        self._repr = f"{self.name} ({self.role}, IN:{self.channels_in}, OUT:{self.channels_out})"
+
+    def __repr__(self) -> str:
+        return self._repr
+
+
+def _device_from_record(d: Any) -> Device:
+    """Build a Device from a raw DAL discovery record."""
+    return Device(
+        name=getattr(d, "name", "Unknown Device"),
+        role=getattr(d, "role", "unknown"),
+        channels_in=getattr(d, "channels_in", 0),
+        channels_out=getattr(d, "channels_out", 0),
+        metadata={"dal_id": getattr(d, "id", ""), "raw": d},
+    )
+
+
+class DeviceScanner:
+    """Discovers Dante devices on the network, with fallback to simulation."""
+
+    @staticmethod
+    def discover_devices_stream(
+        timeout_ms: int = 1000,
+        deadline_ms: int = 2500,
+        max_attempts: int = 3,
+    ) -> Iterator[Device]:
+        """Yield devices as discovery rounds complete, instead of at the end.
+
+        mDNS stacks routinely miss replies on the first pass, so discovery
+        runs several rounds with exponential back-off until the deadline;
+        each new device is yielded as soon as its round returns so callers
+        can show progress while later rounds are still in flight. Devices
+        are de-duplicated by (name, mac) across rounds. When DAL is absent
+        or finds nothing, the simulated fallback set is yielded instead.
+        """
+        found = False
+        # If DAL is installed and importable, use it
+        if _DAL_SCANNER_CLS is not None:
+            try:
+                dal_scanner = _get_dal_scanner()
+                ifaces = _net_interfaces()
+                seen: set = set()
+                start = time.monotonic()
+                for attempt in range(max_attempts):
+                    for d in _discovery_round(dal_scanner, ifaces, timeout_ms):
+                        key = (getattr(d, "name", ""), getattr(d, "mac", ""))
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        found = True
+                        yield _device_from_record(d)
+                    if time.monotonic() - start >= deadline_ms / 1000:
+                        break
+                    if attempt + 1 < max_attempts:
+                        time.sleep(min(0.25 * 2 ** attempt, 1.0))
+            except Exception as e:
+                logger.warning(
+                    "DAL discovery failed: %s; falling back to simulation.", e
+                )
+
+        if not found:
+            # Simulated devices as fallback
+            yield Device(name="Yamaha TF1", role="console", channels_in=32, channels_out=16)
+            yield Device(name="Yamaha Rio3224-D2", role="stagebox", channels_in=32, channels_out=24)
+            yield Device(name="LA12X", role="amplifier", channels_in=2, channels_out=4)
+            yield Device(name="Shure Axient", role="monitor", channels_in=8, channels_out=8)
+
+    @staticmethod
+    def discover_devices(
+        timeout_ms: int = 1000,
+        deadline_ms: int = 2500,
+        max_attempts: int = 3,
+    ) -> List[Device]:
+        return list(
+            DeviceScanner.discover_devices_stream(timeout_ms, deadline_ms, max_attempts)
+        )
+
+
+# Suggestion descriptions, hoisted so the pair loops reuse one string object
+_SB_CON = "Route stagebox → console"
+_CON_AMP = "Route console → amplifier"
+_CON_MON = "Route console → monitor"
+
+
+class PatchSuggestion:
+    """Represents a suggested routing between two devices."""
+    __slots__ = ("source", "destination", "description", "_text")
+
+    def __init__(self, source: Device, destination: Device, description: str) -> None:
+        self.source = source
+        self.destination = destination
+        self.description = description
+        # Built once; redraws and prints reuse the cached string
+        self._text = f"{description}: {source.name} → {destination.name}"
+
+    def __repr__(self) -> str:
+        return self._text
+
+
+def _bipartite_match(
+    left: List[Device], right: List[Device], edge_ok: Any
+) -> List[Tuple[Device, Device]]:
+    """Maximum bipartite matching between two device lists (Hopcroft-Karp).
+
+    edge_ok(src, dst) gates which pairs are allowed. BFS layering plus DFS
+    augmentation over index-based adjacency gives O(E·√V); indices are used
+    because Device instances are not hashable. Returns the matched
+    (left, right) device pairs.
+    """
+    inf = float("inf")
+    adj = [[j for j, r in enumerate(right) if edge_ok(l, r)] for l in left]
+    match_l = [-1] * len(left)
+    match_r = [-1] * len(right)
+    dist: List[float] = [inf] * len(left)
+
+    def bfs() -> bool:
+        q: collections.deque = collections.deque()
+        for i in range(len(left)):
+            if match_l[i] == -1:
+                dist[i] = 0
+                q.append(i)
+            else:
+                dist[i] = inf
+        reachable_free = False
+        while q:
+            i = q.popleft()
+            for j in adj[i]:
+                k = match_r[j]
+                if k == -1:
+                    reachable_free = True
+                elif dist[k] == inf:
+                    dist[k] = dist[i] + 1
+                    q.append(k)
+        return reachable_free
+
+    def dfs(i: int) -> bool:
+        for j in adj[i]:
+            k = match_r[j]
+            if k == -1 or (dist[k] == dist[i] + 1 and dfs(k)):
+                match_l[i] = j
+                match_r[j] = i
+                return True
+        dist[i] = inf
+        return False
+
+    while bfs():
+        for i in range(len(left)):
+            if match_l[i] == -1:
+                dfs(i)
+    return [(left[i], right[j]) for i, j in enumerate(match_l) if j != -1]
+
+
+@dataclass(slots=True)
+class SuggestionBatch:
+    """Structure-of-arrays form of a suggestion list.
+
+    Three aligned lists instead of one object per suggestion; bulk consumers
+    iterate by index without per-object attribute loads.
+    """
+    sources: List[Device] = field(default_factory=list)
+    destinations: List[Device] = field(default_factory=list)
+    descriptions: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+
+class AutoPatchEngine:
+    """
+    Generates and applies patch suggestions.
+
+    The engine analyses the list of available devices and proposes routings
+    based on simple heuristics: stageboxes feed consoles, consoles feed
+    amplifiers and monitors.  When applying a patch the engine will attempt
+    to use the DAL API if available, otherwise it simply prints the routes.
+    """
+    def __init__(self, devices: List[Device]) -> None:
+        self.devices = devices
+        self._cached_sig: Optional[Tuple[Tuple[str, str], ...]] = None
+        self._cached_suggestions: Optional[List[PatchSuggestion]] = None
+
+    def generate_suggestions(self) -> List[PatchSuggestion]:
+        # Unchanged device sets (typical across refreshes, since mDNS caches
+        # replies for minutes) reuse the previous list instead of rebuilding.
+        sig = tuple(sorted((d.name, d.role) for d in self.devices))
+        if sig == self._cached_sig and self._cached_suggestions is not None:
+            return self._cached_suggestions
+        # Partition by role with a C-level sort + groupby pass; unknown roles
+        # simply never get looked up. Sorting by (role, name) also makes the
+        # output deterministic when mDNS reply order varies between runs,
+        # which downstream caches and the GUI rely on to skip rebuilds.
+        ordered = sorted(self.devices, key=operator.attrgetter("role", "name"))
+        buckets = {
+            r: list(g)
+            for r, g in itertools.groupby(ordered, key=operator.attrgetter("role"))
+        }
+        consoles = buckets.get("console", [])
+        stageboxes = buckets.get("stagebox", [])
+        amplifiers = buckets.get("amplifier", [])
+        monitors = buckets.get("monitor", [])
+        if len(self.devices) < 4:
+            # Degenerate sets: exhaustive pairing is cheap and more useful
+            suggestions = self._cartesian_suggestions(
+                consoles, stageboxes, amplifiers, monitors
+            )
+        else:
+            suggestions = self._matched_suggestions(
+                consoles, stageboxes, amplifiers, monitors
+            )
+        self._cached_sig = sig
+        self._cached_suggestions = suggestions
+        return suggestions
+
+    @staticmethod
+    def _cartesian_suggestions(
+        consoles: List[Device],
+        stageboxes: List[Device],
+        amplifiers: List[Device],
+        monitors: List[Device],
+    ) -> List[PatchSuggestion]:
+        # Basic heuristics; itertools.product iterates the pairs in C rather
+        # than through nested Python-level loops.
+        suggestions: List[PatchSuggestion] = []
+        suggestions.extend(
+            PatchSuggestion(sb, con, _SB_CON)
+            for sb, con in itertools.product(stageboxes, consoles)
+        )
+        suggestions.extend(
+            PatchSuggestion(con, amp, _CON_AMP)
+            for con, amp in itertools.product(consoles, amplifiers)
+        )
+        suggestions.extend(
+            PatchSuggestion(con, mon, _CON_MON)
+            for con, mon in itertools.product(consoles, monitors)
+        )
+        return suggestions
+
+    @staticmethod
+    def _matched_suggestions(
+        consoles: List[Device],
+        stageboxes: List[Device],
+        amplifiers: List[Device],
+        monitors: List[Device],
+    ) -> List[PatchSuggestion]:
+        # Each source is matched to at most one target per layer, preferring
+        # targets whose inputs can take all of the source's outputs; if no
+        # pair in a layer satisfies that, any pair with usable channels is
+        # allowed so the layer still routes. Suggestion count stays linear in
+        # the larger side instead of the full Cartesian product.
+        def fits(src: Device, dst: Device) -> bool:
+            return 0 < src.channels_out <= dst.channels_in
+
+        def usable(src: Device, dst: Device) -> bool:
+            return src.channels_out > 0 and dst.channels_in > 0
+
+        suggestions: List[PatchSuggestion] = []
+        for sources, targets, desc in (
+            (stageboxes, consoles, _SB_CON),
+            (consoles, amplifiers, _CON_AMP),
+            (consoles, monitors, _CON_MON),
+        ):
+            pairs = _bipartite_match(sources, targets, fits)
+            if not pairs:
+                pairs = _bipartite_match(sources, targets, usable)
+            suggestions.extend(PatchSuggestion(a, b, desc) for a, b in pairs)
+        return suggestions
+
+    def generate_suggestions_batch(self) -> SuggestionBatch:
+        """The current suggestions repacked as a SuggestionBatch."""
+        batch = SuggestionBatch()
+        for s in self.generate_suggestions():
+            batch.sources.append(s.source)
+            batch.destinations.append(s.destination)
+            batch.descriptions.append(s.description)
+        return batch
+
+    def apply_patch_batch(self, batch: SuggestionBatch) -> None:
+        """Apply a SuggestionBatch by indexing its parallel arrays."""
+        sources = batch.sources
+        destinations = batch.destinations
+        if _DAL_SCANNER_CLS is not None:
+            try:
+                for i in range(len(batch)):
+                    # Insert real subscription call here using DAL API
+                    logger.debug(
+                        "[DAL] Subscribing %s -> %s",
+                        sources[i].name,
+                        destinations[i].name,
+                    )
+                return
+            except Exception as e:
+                logger.warning("DAL patch failed: %s; printing routes.", e)
+        # Print routes
+        print("Applying patch routes:")
+        for i in range(len(batch)):
+            print(f" - {batch.descriptions[i]}: {sources[i].name} → {destinations[i].name}")
+
+    def apply_patch(self, suggestions: List[PatchSuggestion]) -> List[PatchSuggestion]:
+        """Apply the given suggestions; returns the ones that failed."""
+        if not suggestions:
+            return []
+        failed: List[PatchSuggestion] = []
+        # Attempt to apply via DAL if available (placeholder). Otherwise, print.
+        if _DAL_SCANNER_CLS is not None:
+            dal_scanner = _get_dal_scanner()
+            subscribe_batch = getattr(dal_scanner, "subscribe_batch", None)
+            if subscribe_batch is not None:
+                # One DAL round-trip for the whole batch instead of N
+                pairs = [
+                    (
+                        (s.source.metadata or {}).get("dal_id", ""),
+                        (s.destination.metadata or {}).get("dal_id", ""),
+                    )
+                    for s in suggestions
+                ]
+                try:
+                    subscribe_batch(pairs)
+                except Exception as e:
+                    logger.warning("DAL batch subscription failed: %s", e)
+                    failed.extend(suggestions)
+                return failed
+            for sugg in suggestions:
+                try:
+                    # Insert real subscription call here using DAL API
+                    logger.debug(
+                        "[DAL] Subscribing %s -> %s",
+                        sugg.source.name,
+                        sugg.destination.name,
+                    )
+                except Exception:
+                    failed.append(sugg)
+            return failed
+        # Print routes in one buffered write instead of a lock/flush per line
+        buf = ["Applying patch routes:"]
+        buf.extend(f" - {sugg._text}" for sugg in suggestions)
+        sys.stdout.write("\n".join(buf) + "\n")
+        return failed
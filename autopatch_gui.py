@@ -3,141 +3,43 @@ Dante AI Autopatch - GUI Edition
 
 This module provides a graphical interface for the Dante AI Autopatch system.
 It is built using Tkinter (included in the Python standard library) so it
-requires no additional third‑party packages. On startup the program scans
-for Dante devices on the local network (falling back to a simulated set if
-no Dante Application Library is installed)【551168751628221†L24-L45】.  It then displays
-the devices and a list of suggested patch routings.  Users can review the
-patch suggestions and click a single button to apply them.  When run under
-Windows the script can be bundled into a standalone executable using
-PyInstaller or built automatically via the provided GitHub Actions workflow.
+requires no additional third‑party packages. The device model, scanner and
+patch engine are shared with the command-line script via autopatch_core.py.
+On startup the program scans for Dante devices on the local network (falling
+back to a simulated set if no Dante Application Library is
+installed)【551168751628221†L24-L45】.  It then displays the devices and a list
+of suggested patch routings.  Users can review the patch suggestions and
+click a single button to apply them.  When run under Windows the script can
+be bundled into a standalone executable using PyInstaller or built
+automatically via the provided GitHub Actions workflow.
 """
 
 from __future__ import annotations
 
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from dataclasses import dataclass, field
-from typing import List, Dict, Any
-
-
-@dataclass
-class Device:
-    """Represents a generic Dante device on the network."""
-    name: str
-    role: str  # e.g. "console", "stagebox", "amplifier", "monitor"
-    channels_in: int
-    channels_out: int
-    metadata: Dict[str, Any] = field(default_factory=dict)
-
-    def __repr__(self) -> str:
-        return f"{self.name} ({self.role}, IN:{self.channels_in}, OUT:{self.channels_out})"
-
-
-class DeviceScanner:
-    """
-    Discovers Dante devices on the network, with fallback to simulation.
-
-    If the official Dante Application Library (DAL) is installed, this class
-    uses it to discover real devices and populate Device objects accordingly.
-    Otherwise, it returns a simulated list of common devices.  This fallback
-    ensures the GUI remains functional even without network access【551168751628221†L24-L45】.
-    """
-    try:
-        # Replace this import with the actual DAL import when available
-        from dante_application_library import DeviceScanner as DALDeviceScanner  # type: ignore
-        DAL_AVAILABLE = True
-    except Exception:
-        DALDeviceScanner = None  # type: ignore
-        DAL_AVAILABLE = False
-
-    @staticmethod
-    def discover_devices() -> List[Device]:
-        devices: List[Device] = []
-        # If DAL is installed and importable, use it
-        if DeviceScanner.DAL_AVAILABLE and DeviceScanner.DALDeviceScanner:
-            try:
-                dal_scanner = DeviceScanner.DALDeviceScanner()
-                dal_devices = dal_scanner.discover_devices()  # hypothetical API
-                for d in dal_devices:
-                    devices.append(
-                        Device(
-                            name=getattr(d, "name", "Unknown Device"),
-                            role=getattr(d, "role", "unknown"),
-                            channels_in=getattr(d, "channels_in", 0),
-                            channels_out=getattr(d, "channels_out", 0),
-                            metadata={"dal_id": getattr(d, "id", ""), "raw": d},
-                        )
-                    )
-            except Exception as e:
-                print(f"[WARN] DAL discovery failed: {e}; falling back to simulation.")
-
-        if not devices:
-            # Simulated devices as fallback
-            devices = [
-                Device(name="Yamaha TF1", role="console", channels_in=32, channels_out=16),
-                Device(name="Yamaha Rio3224-D2", role="stagebox", channels_in=32, channels_out=24),
-                Device(name="LA12X", role="amplifier", channels_in=2, channels_out=4),
-                Device(name="Shure Axient", role="monitor", channels_in=8, channels_out=8),
-            ]
-        return devices
-
-
-class PatchSuggestion:
-    """Represents a suggested routing between two devices."""
-    def __init__(self, source: Device, destination: Device, description: str) -> None:
-        self.source = source
-        self.destination = destination
-        self.description = description
-
-    def __repr__(self) -> str:
-        return f"{self.description}: {self.source.name} → {self.destination.name}"
-
-
-class AutoPatchEngine:
-    """
-    Generates and applies patch suggestions.
-
-    The engine analyses the list of available devices and proposes routings
-    based on simple heuristics: stageboxes feed consoles, consoles feed
-    amplifiers and monitors.  When applying a patch the engine will attempt
-    to use the DAL API if available, otherwise it simply prints the routes.
-    """
-    def __init__(self, devices: List[Device]) -> None:
-        self.devices = devices
-
-    def generate_suggestions(self) -> List[PatchSuggestion]:
-        suggestions: List[PatchSuggestion] = []
-        consoles = [d for d in self.devices if d.role == "console"]
-        stageboxes = [d for d in self.devices if d.role == "stagebox"]
-        amplifiers = [d for d in self.devices if d.role == "amplifier"]
-        monitors = [d for d in self.devices if d.role == "monitor"]
-        for stagebox in stageboxes:
-            for console in consoles:
-                suggestions.append(PatchSuggestion(stagebox, console, "Route stagebox → console"))
-        for console in consoles:
-            for amp in amplifiers:
-                suggestions.append(PatchSuggestion(console, amp, "Route console → amplifier"))
-        for console in consoles:
-            for mon in monitors:
-                suggestions.append(PatchSuggestion(console, mon, "Route console → monitor"))
-        return suggestions
-
-    def apply_patch(self, suggestions: List[PatchSuggestion]) -> None:
-        # Attempt to apply via DAL if available (placeholder). Otherwise, print.
-        if DeviceScanner.DAL_AVAILABLE and DeviceScanner.DALDeviceScanner:
-            try:
-                for sugg in suggestions:
-                    src = sugg.source
-                    dst = sugg.destination
-                    # Insert real subscription call here using DAL API
-                    print(f"[DAL] Subscribing {src.name} → {dst.name}")
-                return
-            except Exception as e:
-                print(f"[WARN] DAL patch failed: {e}; printing routes.")
-        # Print routes
-        print("Applying patch routes:")
-        for sugg in suggestions:
-            print(f" - {sugg}")
+from typing import List, Optional
+
+from autopatch_core import AutoPatchEngine, Device, DeviceScanner, PatchSuggestion
+
+# Styling literals hoisted to module level so widget construction reuses the
+# same tuples and strings instead of rebuilding them per instantiation —
+# worth having on the PyInstaller cold-start path.
+_FONT_TITLE = ("Segoe UI", 18, "bold")
+_FONT_SUBTITLE = ("Segoe UI", 10)
+_FONT_SECTION = ("Segoe UI", 12, "bold")
+_COLORS = {
+    "bg": "#181a1f",
+    "panel": "#1e2127",
+    "field": "#2c303a",
+    "accent": "#00bfff",
+    "accent_active": "#0095c7",
+    "text": "#ffffff",
+    "muted": "#a5adbb",
+    "select_fg": "#000000",
+}
 
 
 class AutopatchGUI(tk.Tk):
@@ -147,103 +49,248 @@ class AutopatchGUI(tk.Tk):
         super().__init__()
         self.title("Dante AI Autopatch")
         # Modern dark theme colors
-        self.configure(bg="#181a1f")
+        self.configure(bg=_COLORS["bg"])
+        self._init_styles()
 
-        # Discover devices and generate suggestions
-        self.devices: List[Device] = DeviceScanner.discover_devices()
+        # Device discovery runs in the background so the window shows
+        # immediately; the lists start empty and fill in once results arrive.
+        self.devices: List[Device] = []
         self.engine = AutoPatchEngine(self.devices)
-        self.suggestions: List[PatchSuggestion] = self.engine.generate_suggestions()
+        self.suggestions: List[PatchSuggestion] = []
+        self._last_sig: Optional[tuple] = None
+        # Backing store and first visible index for the virtualized
+        # suggestion view; only the visible slice exists as widget items.
+        self._sug_rows: List[str] = []
+        self._sug_top = 0
 
         # Build UI
         self._build_widgets()
 
+        # Devices stream in through this queue; None marks end of discovery.
+        self._device_queue: "queue.Queue[Optional[Device]]" = queue.Queue()
+        self._discovery_thread = threading.Thread(
+            target=self._discover_async, daemon=True
+        )
+        self._discovery_thread.start()
+        self.after(50, self._drain_discovery_queue)
+
+    def _discover_async(self) -> None:
+        """Stream discovery results into the queue from a worker thread."""
+        for device in DeviceScanner.discover_devices_stream():
+            self._device_queue.put(device)
+        self._device_queue.put(None)
+
+    def _drain_discovery_queue(self) -> None:
+        """Pull a batch of freshly discovered devices into the list each tick."""
+        batch: List[Device] = []
+        finished = False
+        while len(batch) < 32:
+            try:
+                item = self._device_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                finished = True
+                break
+            batch.append(item)
+        if batch:
+            # One insert call per batch: a single Tcl round-trip and redraw
+            # instead of one per row.
+            self.devices.extend(batch)
+            self.device_list.insert(tk.END, *[dev._repr for dev in batch])
+        if finished:
+            self._on_discovery_done()
+        else:
+            self.after(50, self._drain_discovery_queue)
+
+    def _on_discovery_done(self) -> None:
+        """Generate suggestions once the worker signals end of discovery."""
+        self._progress.stop()
+        self._progress.pack_forget()
+        self.engine = AutoPatchEngine(self.devices)
+        self.suggestions = self.engine.generate_suggestions()
+        # Suggestion output is deterministic, so an unchanged signature means
+        # the Listbox already shows exactly these rows — skip the rebuild.
+        new_sig = tuple(
+            (s.source.name, s.destination.name, s.description)
+            for s in self.suggestions
+        )
+        if new_sig != self._last_sig:
+            self._last_sig = new_sig
+            self._sug_rows = [s._text for s in self.suggestions]
+            self._sug_top = 0
+            self._render_suggest_window()
+        self._apply_btn.configure(state=tk.NORMAL)
+
+    def _init_styles(self) -> None:
+        """Configure named ttk styles once; widgets reference them by name."""
+        style = ttk.Style(self)
+        style.configure(
+            "Autopatch.Treeview",
+            background=_COLORS["field"],
+            fieldbackground=_COLORS["field"],
+            foreground=_COLORS["text"],
+            borderwidth=0,
+        )
+        style.map(
+            "Autopatch.Treeview",
+            background=[("selected", _COLORS["accent"])],
+            foreground=[("selected", _COLORS["select_fg"])],
+        )
+
     def _build_widgets(self) -> None:
         # Title label
         title = tk.Label(
             self,
             text="Dante AI Autopatch",
-            font=("Segoe UI", 18, "bold"),
-            fg="#00bfff",
-            bg="#181a1f",
+            font=_FONT_TITLE,
+            fg=_COLORS["accent"],
+            bg=_COLORS["bg"],
         )
         title.pack(pady=(10, 5))
 
         subtitle = tk.Label(
             self,
             text="Sélectionnez un routage suggéré et appliquez-le",
-            font=("Segoe UI", 10),
-            fg="#a5adbb",
-            bg="#181a1f",
+            font=_FONT_SUBTITLE,
+            fg=_COLORS["muted"],
+            bg=_COLORS["bg"],
         )
         subtitle.pack(pady=(0, 10))
 
-        container = tk.Frame(self, bg="#181a1f")
+        container = tk.Frame(self, bg=_COLORS["bg"])
         container.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
         # Left panel: device list
-        device_frame = tk.Frame(container, bg="#1e2127", bd=1, relief=tk.RIDGE)
+        device_frame = tk.Frame(container, bg=_COLORS["panel"], bd=1, relief=tk.RIDGE)
         device_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
         device_title = tk.Label(
             device_frame,
             text="Appareils détectés",
-            font=("Segoe UI", 12, "bold"),
-            fg="#00bfff",
-            bg="#1e2127",
+            font=_FONT_SECTION,
+            fg=_COLORS["accent"],
+            bg=_COLORS["panel"],
         )
         device_title.pack(fill=tk.X, padx=5, pady=5)
         self.device_list = tk.Listbox(
             device_frame,
-            bg="#2c303a",
-            fg="#ffffff",
-            selectbackground="#00bfff",
-            selectforeground="#000000",
+            bg=_COLORS["field"],
+            fg=_COLORS["text"],
+            selectbackground=_COLORS["accent"],
+            selectforeground=_COLORS["select_fg"],
             highlightthickness=0,
             borderwidth=0,
         )
-        # Populate device list
-        for dev in self.devices:
-            self.device_list.insert(tk.END, str(dev))
         self.device_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
 
         # Right panel: suggestions
-        suggest_frame = tk.Frame(container, bg="#1e2127", bd=1, relief=tk.RIDGE)
+        suggest_frame = tk.Frame(container, bg=_COLORS["panel"], bd=1, relief=tk.RIDGE)
         suggest_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
         suggest_title = tk.Label(
             suggest_frame,
             text="Routages suggérés",
-            font=("Segoe UI", 12, "bold"),
-            fg="#00bfff",
-            bg="#1e2127",
+            font=_FONT_SECTION,
+            fg=_COLORS["accent"],
+            bg=_COLORS["panel"],
         )
         suggest_title.pack(fill=tk.X, padx=5, pady=5)
-        self.suggest_list = tk.Listbox(
+        # Virtualized suggestion view: a Treeview holding only the rows that
+        # are currently visible, so widget cost is O(visible) rather than
+        # O(total) when discovery produces hundreds of suggestions.
+        self._sug_rowheight = 20
+        self.suggest_view = ttk.Treeview(
             suggest_frame,
-            bg="#2c303a",
-            fg="#ffffff",
-            selectbackground="#00bfff",
-            selectforeground="#000000",
-            highlightthickness=0,
-            borderwidth=0,
+            columns=("desc",),
+            show="",
+            height=20,
+            style="Autopatch.Treeview",
+            takefocus=0,
         )
-        for s in self.suggestions:
-            self.suggest_list.insert(tk.END, repr(s))
-        self.suggest_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self.suggest_view.column("desc", anchor=tk.W)
+        self._sug_vsb = ttk.Scrollbar(
+            suggest_frame, orient=tk.VERTICAL, command=self._on_suggest_scroll
+        )
+        self._sug_vsb.pack(side=tk.RIGHT, fill=tk.Y, pady=(0, 5))
+        self.suggest_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self.suggest_view.bind("<MouseWheel>", self._on_suggest_wheel)
+        self.suggest_view.bind("<Button-4>", self._on_suggest_wheel)
+        self.suggest_view.bind("<Button-5>", self._on_suggest_wheel)
+        self.suggest_view.bind(
+            "<Configure>", lambda _e: self._render_suggest_window()
+        )
+
+        # Indeterminate progress bar shown while discovery runs
+        self._progress = ttk.Progressbar(self, mode="indeterminate")
+        self._progress.pack(fill=tk.X, padx=10, pady=(5, 0))
+        self._progress.start(10)
 
-        # Apply button
-        btn = tk.Button(
+        # Apply button (disabled until discovery delivers suggestions)
+        self._apply_btn = tk.Button(
             self,
             text="Appliquer le patch",
-            font=("Segoe UI", 12, "bold"),
-            bg="#00bfff",
-            fg="#181a1f",
-            activebackground="#0095c7",
-            activeforeground="#ffffff",
+            font=_FONT_SECTION,
+            bg=_COLORS["accent"],
+            fg=_COLORS["bg"],
+            activebackground=_COLORS["accent_active"],
+            activeforeground=_COLORS["text"],
             relief=tk.FLAT,
             command=self._on_apply,
             padx=10,
             pady=5,
+            state=tk.DISABLED,
         )
-        btn.pack(pady=10)
+        self._apply_btn.pack(pady=10)
+
+    def _suggest_visible_rows(self) -> int:
+        height = self.suggest_view.winfo_height()
+        if height <= 1:  # not mapped yet; fall back to the configured height
+            return int(self.suggest_view.cget("height"))
+        return max(1, height // self._sug_rowheight)
+
+    def _render_suggest_window(self) -> None:
+        """Materialize only the visible slice of the suggestion rows."""
+        view = self.suggest_view
+        view.delete(*view.get_children())
+        total = len(self._sug_rows)
+        visible = self._suggest_visible_rows()
+        top = max(0, min(self._sug_top, total - visible))
+        self._sug_top = top
+        for i in range(top, min(top + visible, total)):
+            view.insert("", tk.END, iid=str(i), values=(self._sug_rows[i],))
+        if total:
+            self._sug_vsb.set(top / total, min(1.0, (top + visible) / total))
+        else:
+            self._sug_vsb.set(0.0, 1.0)
+
+    def _scroll_suggest_to(self, top: int) -> None:
+        total = len(self._sug_rows)
+        top = max(0, min(top, max(0, total - self._suggest_visible_rows())))
+        if top != self._sug_top:
+            self._sug_top = top
+            self._render_suggest_window()
+
+    def _on_suggest_scroll(self, *args: str) -> None:
+        """Scrollbar command for the virtualized suggestion view."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_suggest_to(round(float(args[1]) * len(self._sug_rows)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._suggest_visible_rows()
+            self._scroll_suggest_to(self._sug_top + step)
+
+    def _on_suggest_wheel(self, event: "tk.Event") -> str:
+        # X11 reports wheel turns as Button-4/5; Windows/macOS use delta
+        if getattr(event, "num", None) == 4:
+            step = -3
+        elif getattr(event, "num", None) == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self._scroll_suggest_to(self._sug_top + step)
+        return "break"
 
     def _on_apply(self) -> None:
         """Handle click on the apply button."""
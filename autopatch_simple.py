@@ -1,10 +1,11 @@
 """
 Dante AI Autopatch Simplified Script (Windows Friendly)
 
-This script combines all of the components of the autopatch plugin into a single
-file so you can run it directly without needing to install additional Python
-packages (other than the Dante Application Library if you want real network
-functionality). It works on Windows, macOS and Linux with Python 3.
+This script is the command-line entry point of the autopatch plugin. The
+device model, scanner and patch engine live in autopatch_core.py next to this
+file; no additional Python packages are required (other than the Dante
+Application Library if you want real network functionality). It works on
+Windows, macOS and Linux with Python 3.
 
 How to use on Windows:
 
@@ -12,7 +13,8 @@ How to use on Windows:
    https://www.python.org/downloads/windows/ and follow the installer. Make
    sure to tick "Add Python to PATH" during installation.
 
-2. **Download this script** and save it somewhere, e.g. on your Desktop.
+2. **Download this script** (together with autopatch_core.py) and save it
+   somewhere, e.g. on your Desktop.
 
 3. **Open Command Prompt** (press Windows key, type `cmd`, press Enter).
 
@@ -32,120 +34,26 @@ How to use on Windows:
 
 To use the script with a real Dante network, you will need to obtain the
 Dante Application Library (DAL) from Audinate. Install it in your Python
-environment and adjust the import lines below accordingly【912166269295393†L148-L170】.
+environment and adjust the import in autopatch_core.py accordingly【912166269295393†L148-L170】.
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Any
-
-@dataclass
-class Device:
-    """Represents a generic Dante device on the network."""
-    name: str
-    role: str  # e.g. "console", "stagebox", "amplifier", "monitor"
-    channels_in: int
-    channels_out: int
-    metadata: Dict[str, Any] = field(default_factory=dict)
-
-    def __repr__(self) -> str:
-        return f"{self.name} ({self.role}, IN:{self.channels_in}, OUT:{self.channels_out})"
-
-
-class DeviceScanner:
-    """Discovers Dante devices on the network, with fallback to simulation."""
-    try:
-        # Replace this import with the actual DAL import when available
-        from dante_application_library import DeviceScanner as DALDeviceScanner  # type: ignore
-        DAL_AVAILABLE = True
-    except Exception:
-        DALDeviceScanner = None  # type: ignore
-        DAL_AVAILABLE = False
-
-    @staticmethod
-    def discover_devices() -> List[Device]:
-        devices: List[Device] = []
-        # If DAL is installed and importable, use it
-        if DeviceScanner.DAL_AVAILABLE and DeviceScanner.DALDeviceScanner:
-            try:
-                dal_scanner = DeviceScanner.DALDeviceScanner()
-                dal_devices = dal_scanner.discover_devices()  # hypothetical API
-                for d in dal_devices:
-                    devices.append(
-                        Device(
-                            name=getattr(d, "name", "Unknown Device"),
-                            role=getattr(d, "role", "unknown"),
-                            channels_in=getattr(d, "channels_in", 0),
-                            channels_out=getattr(d, "channels_out", 0),
-                            metadata={"dal_id": getattr(d, "id", ""), "raw": d},
-                        )
-                    )
-            except Exception as e:
-                print(f"[WARN] DAL discovery failed: {e}; falling back to simulation.")
-
-        if not devices:
-            # Simulated devices as fallback
-            devices = [
-                Device(name="Yamaha TF1", role="console", channels_in=32, channels_out=16),
-                Device(name="Yamaha Rio3224-D2", role="stagebox", channels_in=32, channels_out=24),
-                Device(name="LA12X", role="amplifier", channels_in=2, channels_out=4),
-                Device(name="Shure Axient", role="monitor", channels_in=8, channels_out=8),
-            ]
-        return devices
-
-
-class PatchSuggestion:
-    """Represents a suggested routing between two devices."""
-    def __init__(self, source: Device, destination: Device, description: str):
-        self.source = source
-        self.destination = destination
-        self.description = description
-
-    def __repr__(self) -> str:
-        return f"{self.description}: {self.source.name} → {self.destination.name}"
-
-
-class AutoPatchEngine:
-    """Generates and applies patch suggestions."""
-    def __init__(self, devices: List[Device]):
-        self.devices = devices
-
-    def generate_suggestions(self) -> List[PatchSuggestion]:
-        suggestions: List[PatchSuggestion] = []
-        consoles = [d for d in self.devices if d.role == "console"]
-        stageboxes = [d for d in self.devices if d.role == "stagebox"]
-        amplifiers = [d for d in self.devices if d.role == "amplifier"]
-        monitors = [d for d in self.devices if d.role == "monitor"]
-        # Basic heuristics
-        for stagebox in stageboxes:
-            for console in consoles:
-                suggestions.append(PatchSuggestion(stagebox, console, "Route stagebox → console"))
-        for console in consoles:
-            for amp in amplifiers:
-                suggestions.append(PatchSuggestion(console, amp, "Route console → amplifier"))
-        for console in consoles:
-            for mon in monitors:
-                suggestions.append(PatchSuggestion(console, mon, "Route console → monitor"))
-        return suggestions
-
-    def apply_patch(self, suggestions: List[PatchSuggestion]) -> None:
-        # Attempt to apply via DAL if available (placeholder). Otherwise, print.
-        if DeviceScanner.DAL_AVAILABLE and DeviceScanner.DALDeviceScanner:
-            try:
-                for sugg in suggestions:
-                    src = sugg.source
-                    dst = sugg.destination
-                    # Insert real subscription call here using DAL API
-                    print(f"[DAL] Subscribing {src.name} → {dst.name}")
-                return
-            except Exception as e:
-                print(f"[WARN] DAL patch failed: {e}; printing routes.")
-        # Print routes
-        print("Applying patch routes:")
-        for sugg in suggestions:
-            print(f" - {sugg}")
+import argparse
+import logging
+
+from autopatch_core import AutoPatchEngine, Device, DeviceScanner, PatchSuggestion
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Dante AI Autopatch")
+    parser.add_argument(
+        "--verbose", action="store_true", help="enable debug logging"
+    )
+    args = parser.parse_args()
+    # Default WARNING keeps the per-subscription debug traces free: the
+    # logger skips both the formatting and the write when disabled.
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING
+    )
     devices = DeviceScanner.discover_devices()
     print("Discovered devices:")
     for dev in devices: